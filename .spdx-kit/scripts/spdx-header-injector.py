@@ -1,41 +1,105 @@
 #!/usr/bin/env python3
-import sys, os, re, argparse
+import sys, os, re, argparse, subprocess, threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 HEADER_PATH_DEFAULT = "config/header-JavaLike.txt"
-SPDX_PATTERN = re.compile(r"SPDX-License-Identifier\s*:\s*", re.IGNORECASE)
+SPDX_PATTERN = re.compile(rb"SPDX-License-Identifier\s*:\s*", re.IGNORECASE)
+SPDX_SCAN_BYTES = 1024
+LINE_END_PATTERN = re.compile(rb"\r\n?|\n")
+EOLS = (b"\n", b"\r\n", b"\r")
+PRINT_LOCK = threading.Lock()
 
-def detect_eol(text: str) -> str:
-    if "\r\n" in text:
-        return "\r\n"
-    if "\r" in text:
-        return "\r"
-    return "\n"
+def log(msg: str, file=None) -> None:
+    with PRINT_LOCK:
+        print(msg, file=file or sys.stdout)
 
-def has_spdx(text: str) -> bool:
-    return bool(SPDX_PATTERN.search(text[:1000]))
+def detect_eol(raw: bytes) -> bytes:
+    # The first line ending decides; only the bytes before the first LF are checked for CR
+    lf = raw.find(b"\n")
+    cr = raw.find(b"\r", 0, lf if lf >= 0 else len(raw))
+    if cr == -1:
+        return b"\n"
+    if cr == lf - 1:
+        return b"\r\n"
+    return b"\r"
 
-def insert_header_java_like(src: str, header: str) -> str:
-    lines = src.splitlines(keepends=True)
-    idx = 0
-    if lines and lines[0].startswith("#!"):
-        idx = 1
-    return "".join(lines[:idx]) + header + "".join(lines[idx:])
+def render_headers(template: bytes) -> dict:
+    header = LINE_END_PATTERN.sub(b"\n", template)
+    return {eol: header.replace(b"\n", eol) for eol in EOLS}
 
-def process_file(path: Path, header: str, dry_run: bool, verbose: bool) -> bool:
-    text = path.read_text(encoding="utf-8", errors="replace")
-    if has_spdx(text):
+def has_spdx(raw: bytes) -> bool:
+    return bool(SPDX_PATTERN.search(raw, 0, SPDX_SCAN_BYTES))
+
+def insert_header_java_like(raw: bytes, header: bytes) -> bytes:
+    split = 0
+    if raw.startswith(b"#!"):
+        m = LINE_END_PATTERN.search(raw)
+        split = m.end() if m else len(raw)
+    return raw[:split] + header + raw[split:]
+
+def iter_files(root: str, exclude_dirs: set, include_exts: set):
+    stack = [root]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                name = entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if name not in exclude_dirs:
+                        stack.append(entry.path)
+                    continue
+                dot = name.rfind('.')
+                if dot > 0 and name[dot:].lower() in include_exts:
+                    yield entry.path
+
+def git_ls_files(root: str):
+    cmd = ["git", "-C", root, "ls-files", "-z", "--cached", "--others", "--exclude-standard"]
+    try:
+        out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    # Unmerged paths are listed once per stage
+    return list(dict.fromkeys(p for p in os.fsdecode(out).split("\0") if p))
+
+def iter_git_files(root: str, rel_paths: list, exclude_dirs: set, include_exts: set):
+    for rel in rel_paths:
+        parts = rel.split("/")
+        name = parts[-1]
+        dot = name.rfind('.')
+        if dot <= 0 or name[dot:].lower() not in include_exts:
+            continue
+        if any(d in exclude_dirs for d in parts[:-1]):
+            continue
+        path = os.path.join(root, rel)
+        # Skip tracked files deleted from the work tree and submodule entries
+        if os.path.isfile(path):
+            yield path
+
+def iter_candidates(root: str, exclude_dirs: set, include_exts: set, use_git: bool):
+    rel_paths = git_ls_files(root) if use_git else None
+    if rel_paths is None:
+        return iter_files(root, exclude_dirs, include_exts)
+    return iter_git_files(root, rel_paths, exclude_dirs, include_exts)
+
+def process_file(path: str, headers: dict, dry_run: bool, verbose: bool) -> bool:
+    with open(path, "rb") as f:
+        raw = f.read()
+    if has_spdx(raw):
         if verbose:
-            print(f"SKIP (has SPDX): {path}")
+            log(f"SKIP (has SPDX): {path}")
         return False
-    eol = detect_eol(text)
-    new_text = insert_header_java_like(text, header.replace("\n", eol))
+    new_raw = insert_header_java_like(raw, headers[detect_eol(raw)])
     if dry_run:
-        print(f"WOULD UPDATE: {path}")
+        log(f"WOULD UPDATE: {path}")
         return True
-    path.write_text(new_text, encoding="utf-8")
+    with open(path, "wb") as f:
+        f.write(new_raw)
     if verbose:
-        print(f"UPDATED: {path}")
+        log(f"UPDATED: {path}")
     return True
 
 def main():
@@ -46,23 +110,26 @@ def main():
     ap.add_argument("--dry-run", action="store_true", help="Show what would change without writing")
     ap.add_argument("--verbose", "-v", action="store_true", help="Verbose output")
     ap.add_argument("--exclude-dirs", default=".git,target,build,out,node_modules,.idea,.gradle", help="Comma-separated dirs to skip")
+    ap.add_argument("--no-git", action="store_true", help="Walk the filesystem even when --root is inside a git work tree")
+    ap.add_argument("--jobs", "-j", type=int, default=min(32, (os.cpu_count() or 1) * 4), help="Number of files to process concurrently")
     args = ap.parse_args()
 
-    header = Path(args.header).read_text(encoding="utf-8")
+    headers = render_headers(Path(args.header).read_bytes())
     include_exts = {e if e.startswith('.') else '.'+e for e in args.exts.split(',') if e.strip()}
     exclude_dirs = set([d.strip() for d in args.exclude_dirs.split(',') if d.strip()])
 
     changed = 0
-    for root, dirs, files in os.walk(args.root):
-        dirs[:] = [d for d in dirs if d not in exclude_dirs]
-        for fn in files:
-            p = Path(root) / fn
-            if p.suffix.lower() in include_exts:
-                try:
-                    if process_file(p, header, args.dry_run, args.verbose):
-                        changed += 1
-                except Exception as e:
-                    print(f"ERROR processing {p}: {e}", file=sys.stderr)
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+        futures = {
+            executor.submit(process_file, p, headers, args.dry_run, args.verbose): p
+            for p in iter_candidates(args.root, exclude_dirs, include_exts, not args.no_git)
+        }
+        for future in as_completed(futures):
+            try:
+                if future.result():
+                    changed += 1
+            except Exception as e:
+                log(f"ERROR processing {futures[future]}: {e}", file=sys.stderr)
     if args.dry_run:
         print(f"[DRY-RUN] Files that would be updated: {changed}")
     else:
@@ -15,7 +15,12 @@ explicit overrides or heuristics are used to pick the correct SI coherent unit.
 
 import json
 import sys
-from collections import defaultdict, OrderedDict
+
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:  # orjson is optional; the stdlib parser gives identical results
+    json_loads = json.loads
 
 JSONL_PATH = (
     "/Users/duncanscott/git-hub/duncanscott/jade-tipi/"
@@ -51,62 +56,65 @@ REFERENCE_UNIT_OVERRIDES = {
     "volumetric number rate": "becquerel per cubic meter",
 }
 
+# Key order of the updated entries: the shape written by parse_uom.py with
+# reference_unit placed after conversion_factor (or after conversion_offset
+# if present)
+FIELD_ORDER = (
+    "unit", "symbol", "plural", "property", "conversion_factor",
+    "reference_unit", "system",
+)
+FIELD_ORDER_WITH_OFFSET = (
+    "unit", "symbol", "plural", "property", "conversion_factor",
+    "system", "conversion_offset", "reference_unit",
+)
+
 
-def find_reference_unit(entries_for_property):
-    """Find the reference unit for a group of entries sharing the same property.
+def find_reference_units(entries):
+    """Find the reference unit for every property in a single pass over entries.
 
     The reference unit is the entry with conversion_factor closest to 1.0
-    and NO conversion_offset.
+    and NO conversion_offset. Ties go to the entry that appears first.
 
-    Returns the singular unit name of the reference unit.
+    Returns a dict mapping property name to the singular unit name of its
+    reference unit.
     """
-    prop = entries_for_property[0]["property"]
-
-    # Check for explicit override first
-    if prop in REFERENCE_UNIT_OVERRIDES:
-        return REFERENCE_UNIT_OVERRIDES[prop]
-
-    # Filter to candidates: no conversion_offset
-    candidates = [
-        e for e in entries_for_property if "conversion_offset" not in e
-    ]
-
-    if not candidates:
+    reference_units = {}
+    # property -> (distance from 1.0, unit) for entries with no conversion_offset
+    best = {}
+    # property -> (distance from 1.0, unit) for all entries
+    fallback = {}
+
+    for e in entries:
+        prop = e["property"]
+
+        # Explicit overrides win outright
+        if prop in REFERENCE_UNIT_OVERRIDES:
+            reference_units[prop] = REFERENCE_UNIT_OVERRIDES[prop]
+            continue
+
+        distance = abs(e["conversion_factor"] - 1.0)
+        current = fallback.get(prop)
+        if current is None or distance < current[0]:
+            fallback[prop] = (distance, e["unit"])
+        if "conversion_offset" not in e:
+            current = best.get(prop)
+            if current is None or distance < current[0]:
+                best[prop] = (distance, e["unit"])
+
+    for prop, (_, unit) in fallback.items():
         # Fallback: all entries have offsets, pick closest to 1.0
-        candidates = entries_for_property
+        reference_units[prop] = best[prop][1] if prop in best else unit
 
-    # Sort by distance from 1.0
-    candidates.sort(key=lambda e: abs(e["conversion_factor"] - 1.0))
-
-    return candidates[0]["unit"]
-
-
-def insert_after_key(ordered_dict, after_key, new_key, new_value):
-    """Insert new_key:new_value into an OrderedDict right after after_key."""
-    items = list(ordered_dict.items())
-    new_items = []
-    for k, v in items:
-        new_items.append((k, v))
-        if k == after_key:
-            new_items.append((new_key, new_value))
-    return OrderedDict(new_items)
+    return reference_units
 
 
 def main():
     # Read all entries
-    with open(JSONL_PATH, "r") as f:
-        entries = [json.loads(line.strip()) for line in f if line.strip()]
-
-    # Group by property
-    by_property = defaultdict(list)
-    for entry in entries:
-        by_property[entry["property"]].append(entry)
+    with open(JSONL_PATH, "r", encoding="utf-8") as f:
+        entries = [json_loads(line) for line in f if line.strip()]
 
     # Determine reference unit for each property
-    reference_units = {}
-    for prop in sorted(by_property.keys()):
-        ref = find_reference_unit(by_property[prop])
-        reference_units[prop] = ref
+    reference_units = find_reference_units(entries)
 
     # Print each property and its reference unit
     print("Reference units by property:")
@@ -121,29 +129,21 @@ def main():
     # (or after conversion_offset if present)
     updated_entries = []
     for entry in entries:
-        ref_unit = reference_units[entry["property"]]
-        od = OrderedDict(entry)
-
-        # Determine insertion point: after conversion_offset if present,
-        # otherwise after conversion_factor
-        if "conversion_offset" in od:
-            insert_after = "conversion_offset"
-        else:
-            insert_after = "conversion_factor"
-
-        od = insert_after_key(od, insert_after, "reference_unit", ref_unit)
-        updated_entries.append(od)
+        entry["reference_unit"] = reference_units[entry["property"]]
+        order = FIELD_ORDER_WITH_OFFSET if "conversion_offset" in entry else FIELD_ORDER
+        updated_entries.append({k: entry[k] for k in order if k in entry})
 
     # Write back
-    with open(JSONL_PATH, "w") as f:
-        for entry in updated_entries:
-            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    lines = [json.dumps(entry, ensure_ascii=False) for entry in updated_entries]
+    with open(JSONL_PATH, "w", encoding="utf-8", buffering=1 << 20) as f:
+        f.write("\n".join(lines))
+        f.write("\n")
 
     print(f"Total entries updated: {len(updated_entries)}")
     print()
 
     # Spot-check specific entries
-    spot_checks = ["liter", "degree Fahrenheit", "mile", "kilogram"]
+    spot_checks = {"liter", "degree Fahrenheit", "mile", "kilogram"}
     print("Spot checks:")
     print("-" * 70)
     for entry in updated_entries:
@@ -7,10 +7,16 @@ Copyright (c) 2019 Mike Boutin, licensed under MIT / Apache-2.0.
 See THIRD-PARTY-LICENSES in the project root for the full license text.
 """
 
+import functools
 import json
 import math
 import os
-from collections import OrderedDict
+
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:  # orjson is optional; the stdlib parser gives identical results
+    json_loads = json.loads
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 SI_FILE = os.path.join(SCRIPT_DIR, "jade_tipi_si_units.jsonl")
@@ -52,6 +58,7 @@ SPECIAL_PLURALS = {
 }
 
 
+@functools.lru_cache(maxsize=None)
 def make_plural(unit_name):
     """Generate plural form of a unit name."""
     if unit_name in SPECIAL_PLURALS:
@@ -62,10 +69,9 @@ def make_plural(unit_name):
     return unit_name + "s"
 
 
-def construct_full_name(si_entry):
-    """Construct the full unit name from an SI entry."""
-    prefix = si_entry.get("prefix")
-    unit = si_entry["unit"]
+@functools.lru_cache(maxsize=None)
+def construct_full_name(prefix, unit):
+    """Construct the full unit name from an SI entry's prefix and unit."""
     if prefix is None:
         return unit
     return prefix + unit
@@ -83,32 +89,44 @@ def format_conversion_factor(value):
 
 def build_ordered_entry(unit, prefix, symbol, plural, prop, conversion_factor,
                         conversion_offset, reference_unit, alternate_unit, system):
-    """Build an OrderedDict with fields in the required order."""
-    entry = OrderedDict()
-    entry["unit"] = unit
-    entry["prefix"] = prefix
-    entry["symbol"] = symbol
-    entry["plural"] = plural
-    entry["property"] = prop
-    entry["conversion_factor"] = conversion_factor
-    if conversion_offset is not None:
-        entry["conversion_offset"] = conversion_offset
-    entry["reference_unit"] = reference_unit
-    if alternate_unit is not None:
-        entry["alternate_unit"] = alternate_unit
-    entry["system"] = system
-    return entry
+    """Build a dict with fields in the required order (dicts keep insertion order).
+
+    conversion_offset and alternate_unit are omitted when None; each of the
+    four resulting shapes is written out as its own dict literal.
+    """
+    if conversion_offset is None:
+        if alternate_unit is None:
+            return {
+                "unit": unit, "prefix": prefix, "symbol": symbol, "plural": plural,
+                "property": prop, "conversion_factor": conversion_factor,
+                "reference_unit": reference_unit, "system": system,
+            }
+        return {
+            "unit": unit, "prefix": prefix, "symbol": symbol, "plural": plural,
+            "property": prop, "conversion_factor": conversion_factor,
+            "reference_unit": reference_unit, "alternate_unit": alternate_unit,
+            "system": system,
+        }
+    if alternate_unit is None:
+        return {
+            "unit": unit, "prefix": prefix, "symbol": symbol, "plural": plural,
+            "property": prop, "conversion_factor": conversion_factor,
+            "conversion_offset": conversion_offset, "reference_unit": reference_unit,
+            "system": system,
+        }
+    return {
+        "unit": unit, "prefix": prefix, "symbol": symbol, "plural": plural,
+        "property": prop, "conversion_factor": conversion_factor,
+        "conversion_offset": conversion_offset, "reference_unit": reference_unit,
+        "alternate_unit": alternate_unit, "system": system,
+    }
 
 
 def load_jsonl(filepath):
     """Load a JSONL file into a list of dicts."""
-    entries = []
     with open(filepath, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if line:
-                entries.append(json.loads(line))
-    return entries
+        # json.loads tolerates the trailing newline, so only blank lines need skipping
+        return [json_loads(line) for line in f if line.strip()]
 
 
 def main():
@@ -121,11 +139,12 @@ def main():
 
     # ---------- Build UOM lookup: (unit_name, property) -> list of entries ----------
     # Some units appear multiple times (e.g., degree Celsius in both temperature interval
-    # and thermodynamic temperature)
+    # and thermodynamic temperature). Each bucket holds (index, entry) pairs so
+    # matches can be recorded without searching uom_entries.
     uom_by_unit_prop = {}
-    for entry in uom_entries:
+    for uom_idx, entry in enumerate(uom_entries):
         key = (entry["unit"], entry["property"])
-        uom_by_unit_prop.setdefault(key, []).append(entry)
+        uom_by_unit_prop.setdefault(key, []).append((uom_idx, entry))
 
     # Also build UOM lookup by just unit name for reference unit discovery
     uom_by_unit = {}
@@ -148,97 +167,102 @@ def main():
         si_by_base_prop.setdefault(key, []).append(entry)
 
     # ---------- Process matches ----------
+    # UOM property name(s) to look for, per SI property: the SI name itself,
+    # then its mapped UOM name when that differs
+    prop_candidates = {}
+    for si_prop in {entry["property"] for entry in si_entries}:
+        uom_prop = SI_TO_UOM_PROPERTY.get(si_prop, si_prop)
+        prop_candidates[si_prop] = (si_prop,) if uom_prop == si_prop else (si_prop, uom_prop)
+
+    # Resolve each SI entry's full name and candidate UOM property names once
+    si_meta = []
+    for si_entry in si_entries:
+        si_prop = si_entry["property"]
+        base_unit = si_entry["unit"]
+        prefix = si_entry.get("prefix")
+        si_meta.append((
+            construct_full_name(prefix, base_unit),
+            si_prop,
+            base_unit,
+            prefix,
+            prop_candidates[si_prop],
+        ))
+
     # Track which UOM entries got matched (by index)
     uom_matched = set()
-    # Track which SI entries got matched
-    si_matched = set()
+    # Track which SI entries found no UOM counterpart (by index)
+    unmatched_si_indices = []
     # Output entries
     output_entries = []
 
+    # While matching, also build a map of base unit conversion info so we can
+    # compute conversion factors for SI entries not in UOM.
+    #
+    # Strategy: for a given base unit (e.g., "gram") with property "mass",
+    # find a matched UOM entry (e.g., "gram" with conversion_factor 0.001 to "kilogram")
+    # and use that to compute conversion factors for all prefixed variants.
+    #
+    # base_unit_info: (si_base_unit, si_property) -> {uom_property, reference_unit, base_cf,
+    # cf_by_prefix} where base_cf is the conversion factor for the null-prefix version
+    # and cf_by_prefix maps each SI prefix to base_cf * its multiplier
+    base_unit_info = {}
+
     # For each SI entry, try to match to UOM
     for si_idx, si_entry in enumerate(si_entries):
-        full_name = construct_full_name(si_entry)
-        si_prop = si_entry["property"]
-
-        # Determine the UOM property name(s) to look for
-        uom_prop_candidates = [si_prop]
-        if si_prop in SI_TO_UOM_PROPERTY:
-            uom_prop_candidates.append(SI_TO_UOM_PROPERTY[si_prop])
+        full_name, si_prop, base_unit, prefix, uom_prop_candidates = si_meta[si_idx]
 
         matched = False
         for uom_prop in uom_prop_candidates:
-            key = (full_name, uom_prop)
-            if key in uom_by_unit_prop:
-                for uom_entry in uom_by_unit_prop[key]:
-                    # Found a match - enrich UOM entry with SI fields
-                    uom_idx = uom_entries.index(uom_entry)
-                    uom_matched.add(uom_idx)
-                    si_matched.add(si_idx)
-
-                    enriched = build_ordered_entry(
-                        unit=uom_entry["unit"],
-                        prefix=si_entry.get("prefix"),
-                        symbol=uom_entry["symbol"],
-                        plural=uom_entry["plural"],
-                        prop=uom_entry["property"],
-                        conversion_factor=uom_entry["conversion_factor"],
-                        conversion_offset=uom_entry.get("conversion_offset"),
-                        reference_unit=uom_entry.get("reference_unit"),
-                        alternate_unit=si_entry.get("alternate_unit"),
-                        system=uom_entry["system"],
-                    )
-                    output_entries.append(enriched)
-                matched = True
-                break  # Don't look at more property candidates
+            matches = uom_by_unit_prop.get((full_name, uom_prop))
+            if matches is None:
+                continue
+
+            for uom_idx, uom_entry in matches:
+                # Found a match - enrich UOM entry with SI fields
+                uom_matched.add(uom_idx)
+
+                enriched = build_ordered_entry(
+                    unit=uom_entry["unit"],
+                    prefix=si_entry.get("prefix"),
+                    symbol=uom_entry["symbol"],
+                    plural=uom_entry["plural"],
+                    prop=uom_entry["property"],
+                    conversion_factor=uom_entry["conversion_factor"],
+                    conversion_offset=uom_entry.get("conversion_offset"),
+                    reference_unit=uom_entry.get("reference_unit"),
+                    alternate_unit=si_entry.get("alternate_unit"),
+                    system=uom_entry["system"],
+                )
+                output_entries.append(enriched)
+
+            info_key = (base_unit, si_prop)
+            if info_key not in base_unit_info:
+                _, uom_entry = matches[0]
+                prefix_mult = PREFIX_MULTIPLIERS.get(prefix, 1.0)
+                # base_cf = cf / prefix_mult (this is what the null-prefix unit would have)
+                base_unit_info[info_key] = {
+                    "uom_property": uom_prop,
+                    "reference_unit": uom_entry.get("reference_unit"),
+                    "base_cf": uom_entry["conversion_factor"] / prefix_mult,
+                }
+            matched = True
+            break  # Don't look at more property candidates
 
         if not matched:
-            si_matched.add(si_idx)  # Still mark as processed
+            unmatched_si_indices.append(si_idx)
+
+    # Expand each base unit's conversion factor over every SI prefix once, so
+    # unmatched entries need a single lookup
+    for info in base_unit_info.values():
+        base_cf = info["base_cf"]
+        info["cf_by_prefix"] = {
+            p: base_cf * mult for p, mult in PREFIX_MULTIPLIERS.items()
+        }
 
     # Count actual matches (SI entries that found UOM counterparts)
     matched_count = len(uom_matched)
 
     # ---------- Handle unmatched SI entries ----------
-    # We need to compute conversion factors for SI entries not in UOM
-
-    # First, build a map of base unit conversion info from UOM matches
-    # For each SI base unit + property, find what the UOM conversion factor is
-    # for the matched entries, so we can compute for unmatched ones.
-    #
-    # Strategy: for a given base unit (e.g., "gram") with property "mass",
-    # find a matched UOM entry (e.g., "gram" with conversion_factor 0.001 to "kilogram")
-    # and use that to compute conversion factors for all prefixed variants.
-
-    # Build base_unit_info: (si_base_unit, si_property) -> {uom_property, reference_unit, base_cf}
-    # where base_cf is the conversion factor for the null-prefix version
-    base_unit_info = {}
-
-    for si_entry in si_entries:
-        full_name = construct_full_name(si_entry)
-        si_prop = si_entry["property"]
-        base_unit = si_entry["unit"]
-        prefix = si_entry.get("prefix")
-
-        # Try all property name candidates
-        uom_prop_candidates = [si_prop]
-        if si_prop in SI_TO_UOM_PROPERTY:
-            uom_prop_candidates.append(SI_TO_UOM_PROPERTY[si_prop])
-
-        for uom_prop in uom_prop_candidates:
-            key = (full_name, uom_prop)
-            if key in uom_by_unit_prop:
-                uom_entry = uom_by_unit_prop[key][0]
-                cf = uom_entry["conversion_factor"]
-                prefix_mult = PREFIX_MULTIPLIERS.get(prefix, 1.0)
-                # base_cf = cf / prefix_mult (this is what the null-prefix unit would have)
-                null_prefix_cf = cf / prefix_mult
-                info_key = (base_unit, si_prop)
-                if info_key not in base_unit_info:
-                    base_unit_info[info_key] = {
-                        "uom_property": uom_prop,
-                        "reference_unit": uom_entry.get("reference_unit"),
-                        "base_cf": null_prefix_cf,
-                    }
-                break
 
     # Special hardcoded conversion info for units with no UOM match at all
     SPECIAL_CONVERSIONS = {
@@ -318,26 +342,9 @@ def main():
     unmatched_si_entries = []
     errors = []
 
-    for si_idx, si_entry in enumerate(si_entries):
-        full_name = construct_full_name(si_entry)
-        si_prop = si_entry["property"]
-        base_unit = si_entry["unit"]
-        prefix = si_entry.get("prefix")
-
-        # Check if this was already matched to a UOM entry
-        uom_prop_candidates = [si_prop]
-        if si_prop in SI_TO_UOM_PROPERTY:
-            uom_prop_candidates.append(SI_TO_UOM_PROPERTY[si_prop])
-
-        already_matched = False
-        for uom_prop in uom_prop_candidates:
-            key = (full_name, uom_prop)
-            if key in uom_by_unit_prop:
-                already_matched = True
-                break
-
-        if already_matched:
-            continue
+    for si_idx in unmatched_si_indices:
+        si_entry = si_entries[si_idx]
+        full_name, si_prop, base_unit, prefix, uom_prop_candidates = si_meta[si_idx]
 
         # This SI entry is unmatched - need to create a new entry
         conversion_factor = None
@@ -367,23 +374,19 @@ def main():
                 conversion_factor = base_cf * (prefix_mult / null_mult)
             elif base_key in base_unit_info:
                 info = base_unit_info[base_key]
-                base_cf = info["base_cf"]
                 reference_unit = info["reference_unit"]
                 output_property = info["uom_property"]
                 # Conversion factor = base_cf * prefix_multiplier
-                prefix_mult = PREFIX_MULTIPLIERS.get(prefix, 1.0)
-                conversion_factor = base_cf * prefix_mult
+                conversion_factor = info["cf_by_prefix"].get(prefix, info["base_cf"])
             else:
                 # Try with mapped property
                 for alt_prop in uom_prop_candidates:
                     alt_key = (base_unit, alt_prop) if alt_prop != si_prop else None
                     if alt_key and alt_key in base_unit_info:
                         info = base_unit_info[alt_key]
-                        base_cf = info["base_cf"]
                         reference_unit = info["reference_unit"]
                         output_property = info["uom_property"]
-                        prefix_mult = PREFIX_MULTIPLIERS.get(prefix, 1.0)
-                        conversion_factor = base_cf * prefix_mult
+                        conversion_factor = info["cf_by_prefix"].get(prefix, info["base_cf"])
                         break
 
         if conversion_factor is None:
@@ -436,9 +439,12 @@ def main():
     all_entries.sort(key=lambda e: (e["property"], e["unit"]))
 
     # ---------- Write output ----------
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        for entry in all_entries:
-            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    # Unit symbols are not ASCII-only (µ, °, ·), so keep ensure_ascii=False
+    # rather than escaping them as \uXXXX
+    lines = [json.dumps(entry, ensure_ascii=False) for entry in all_entries]
+    with open(OUTPUT_FILE, "w", encoding="utf-8", buffering=1 << 20) as f:
+        f.write("\n".join(lines))
+        f.write("\n")
 
     # ---------- Report ----------
     print(f"\n=== MERGE REPORT ===")
@@ -457,9 +463,12 @@ def main():
     # ---------- Spot checks ----------
     spot_check = ["liter", "milliliter", "kilogram", "gram", "degree Fahrenheit",
                   "arcminute", "neper", "decibel"]
+    by_unit_name = {}
+    for e in all_entries:
+        by_unit_name.setdefault(e["unit"], []).append(e)
     print(f"\n=== SPOT CHECKS ===")
     for name in spot_check:
-        found = [e for e in all_entries if e["unit"] == name]
+        found = by_unit_name.get(name, [])
         if found:
             for e in found:
                 print(f"\n{name} ({e['property']}):")
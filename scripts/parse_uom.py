@@ -8,15 +8,25 @@ Copyright (c) 2019 Mike Boutin, licensed under MIT / Apache-2.0.
 See THIRD-PARTY-LICENSES in the project root for the full license text.
 """
 
+import functools
 import json
+import mmap
 import os
 import re
 import sys
-from pathlib import Path
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
 
 # Directories
-SI_DIR = Path("/Users/duncanscott/git-hub/iliekturtles/uom/src/si")
-OUTPUT_FILE = Path("/Users/duncanscott/git-hub/duncanscott/jade-tipi/libraries/jade-tipi-dto/src/main/resources/units/jade_tipi_units.jsonl")
+# SI_DIR is the src/si directory of a uom checkout (override with UOM_SI_DIR);
+# the output goes to the DTO library resources of this repository
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SI_DIR = os.environ.get("UOM_SI_DIR", "/Users/duncanscott/git-hub/iliekturtles/uom/src/si")
+OUTPUT_FILE = os.path.join(
+    os.path.dirname(SCRIPT_DIR),
+    "libraries", "jade-tipi-dto", "src", "main", "resources", "units", "jade_tipi_units.jsonl",
+)
 
 # Files to exclude
 EXCLUDED_FILES = {"mod.rs", "prefix.rs"}
@@ -44,16 +54,18 @@ PREFIX_VALUES = {
     "atto": 1.0e-18,
     "zepto": 1.0e-21,
     "yocto": 1.0e-24,
-    # IEC binary prefixes
-    "yobi": 1024 ** 8,
-    "zebi": 1024 ** 7,
-    "exbi": 1024 ** 6,
-    "pebi": 1024 ** 5,
-    "tebi": 1024 ** 4,
-    "gibi": 1024 ** 3,
-    "mebi": 1024 ** 2,
-    "kibi": 1024,
+    # IEC binary prefixes (1024 ** 8 down to 1024, all exact as floats)
+    "yobi": 1.2089258196146292e24,
+    "zebi": 1.1805916207174113e21,
+    "exbi": 1.152921504606847e18,
+    "pebi": 1125899906842624.0,
+    "tebi": 1099511627776.0,
+    "gibi": 1073741824.0,
+    "mebi": 1048576.0,
+    "kibi": 1024.0,
 }
+assert all(PREFIX_VALUES[name] == 1024 ** power for power, name in enumerate(
+    ("kibi", "mebi", "gibi", "tebi", "pebi", "exbi", "zebi", "yobi"), start=1))
 
 # Known IEC binary prefix names (for system classification)
 IEC_PREFIXES = {"yobi", "zebi", "exbi", "pebi", "tebi", "gibi", "mebi", "kibi"}
@@ -182,22 +194,143 @@ ANCIENT_ROMAN_UNITS = {
 # Note: Some identifiers overlap across different properties (e.g., "uncia" in both length and mass).
 # The Roman detection is done per-file using comment context, not just by identifier name.
 
-
-def clean_rust_number(s):
-    """Remove Rust underscores from number literals and handle Rust float syntax."""
-    s = s.strip()
-    # Remove underscores used as digit separators
-    s = s.replace("_", "")
-    return s
-
-
-def resolve_prefix(name):
-    """Resolve a prefix!() macro to its numeric value."""
-    if name in PREFIX_VALUES:
-        return PREFIX_VALUES[name]
-    raise ValueError(f"Unknown prefix: {name}")
-
-
+# Known unit identifier -> system, flattened from the sets above. Earlier sets
+# take precedence if an identifier is ever listed twice. Information units only
+# apply to the "information" property (checked in classify_system).
+UNIT_TO_SYSTEM = {}
+for _units, _system in [
+    (IMPERIAL_US_UNITS, "Imperial"),
+    (CGS_UNITS, "CGS"),
+    (NAUTICAL_UNITS, "Nautical"),
+    (ASTRONOMICAL_UNITS, "Astronomical"),
+    (INFORMATION_UNITS, "Information"),
+    (ATOMIC_NATURAL_UNITS, "Atomic/Natural"),
+    (METRIC_NON_SI_UNITS, "Metric"),
+]:
+    for _unit in _units:
+        UNIT_TO_SYSTEM.setdefault(_unit, _system)
+
+# quantity: TypeName; "property_name";
+QUANTITY_RE = re.compile(rb'quantity:\s+\w+;\s*"([^"]+)"')
+
+# Opening of the units { ... } block; its end is found by brace depth
+UNITS_BLOCK_START_RE = re.compile(rb'units\s*\{')
+
+# Tokens of a units block: line comments, string literals, @identifiers, and
+# the punctuation that delimits entries. Everything else is expression text.
+# These patterns run over the raw file bytes, where \w is ASCII-only, so
+# identifiers also accept any UTF-8 lead/continuation byte (e.g. @ångström).
+TOKEN_RE = re.compile(rb'(//[^\n]*)|("[^"]*")|@([\w\x80-\xff]*)|([;,(){}])')
+TOKEN_COMMENT, TOKEN_STRING, TOKEN_IDENTIFIER, TOKEN_PUNCT = 1, 2, 3, 4
+
+# Comment line that opens the Ancient Roman section of a file
+ROMAN_COMMENT_RE = re.compile(rb'//+\s*[Aa]ncient\s+[Rr]oman')
+
+# prefix!(name) macro in a conversion expression
+PREFIX_MACRO_RE = re.compile(r'prefix!\((\w+)\)')
+
+# Python literal for each prefix value, substituted for prefix!(name) before evaluation
+PREFIX_REPRS = {name: repr(value) for name, value in PREFIX_VALUES.items()}
+
+# Rust float literal that may use '_' digit separators, e.g. 1.609_344_E3
+NUMBER_TOKEN_RE = re.compile(r'\d[\d_]*(?:\.[\d_]*)?(?:[eE][+-]?\d+)?')
+
+# A cleaned conversion expression that is just one unsigned float literal
+FLOAT_LITERAL_RE = re.compile(r'\d+\.?\d*(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?')
+
+# Tokens of a cleaned conversion expression: float literals and operators
+ARITH_TOKEN_RE = re.compile(r'\s*(?:(\d+\.?\d*(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)|([-+*/()]))')
+
+# Deletes the arithmetic operators and whitespace left around prefix!() macros
+STRIP_OPERATORS = str.maketrans('', '', '*/+- \t\n\r\f\v')
+
+# What may remain of an SI expression once its prefix!() macros and
+# operators are removed: nothing, or a bits-per-byte style divisor
+SI_EXPR_REMAINDERS = frozenset({'', '8.0', '2.0', '4.0'})
+
+
+def replace_prefix(m):
+    """Substitute a prefix!(name) match with the prefix's numeric literal."""
+    name = m.group(1)
+    if name not in PREFIX_REPRS:
+        raise ValueError(f"Unknown prefix: {name}")
+    return PREFIX_REPRS[name]
+
+
+def clean_number_token(m):
+    """Drop Rust '_' digit separators from a numeric literal match."""
+    return m.group(0).replace("_", "")
+
+
+def tokenize_arithmetic(expr):
+    """Split an arithmetic expression into float literals and operator characters."""
+    tokens = []
+    expr = expr.rstrip()
+    pos = 0
+    while pos < len(expr):
+        m = ARITH_TOKEN_RE.match(expr, pos)
+        if not m:
+            raise ValueError(f"unexpected {expr[pos:].lstrip()!r}")
+        number, op = m.groups()
+        tokens.append(float(number) if number is not None else op)
+        pos = m.end()
+    return tokens
+
+
+def parse_sum(tokens, pos):
+    """sum := product (('+' | '-') product)*"""
+    value, pos = parse_product(tokens, pos)
+    while pos < len(tokens) and tokens[pos] in ('+', '-'):
+        op = tokens[pos]
+        rhs, pos = parse_product(tokens, pos + 1)
+        value = value + rhs if op == '+' else value - rhs
+    return value, pos
+
+
+def parse_product(tokens, pos):
+    """product := factor (('*' | '/') factor)*"""
+    value, pos = parse_factor(tokens, pos)
+    while pos < len(tokens) and tokens[pos] in ('*', '/'):
+        op = tokens[pos]
+        rhs, pos = parse_factor(tokens, pos + 1)
+        value = value * rhs if op == '*' else value / rhs
+    return value, pos
+
+
+def parse_factor(tokens, pos):
+    """factor := ('+' | '-') factor | number | '(' sum ')'"""
+    if pos >= len(tokens):
+        raise ValueError("unexpected end of expression")
+    token = tokens[pos]
+    if token == '-':
+        value, pos = parse_factor(tokens, pos + 1)
+        return -value, pos
+    if token == '+':
+        return parse_factor(tokens, pos + 1)
+    if token == '(':
+        value, pos = parse_sum(tokens, pos + 1)
+        if pos >= len(tokens) or tokens[pos] != ')':
+            raise ValueError("missing ')'")
+        return value, pos + 1
+    if isinstance(token, float):
+        return token, pos + 1
+    raise ValueError(f"unexpected {token!r}")
+
+
+def evaluate_arithmetic(expr):
+    """Evaluate +, -, *, / and parentheses over float literals."""
+    # Most expressions reduce to a single literal once prefixes are substituted
+    if FLOAT_LITERAL_RE.fullmatch(expr):
+        return float(expr)
+
+    tokens = tokenize_arithmetic(expr)
+    value, pos = parse_sum(tokens, 0)
+    if pos != len(tokens):
+        raise ValueError(f"unexpected {tokens[pos]!r}")
+    return value
+
+
+@functools.lru_cache(maxsize=8192)
 def evaluate_conversion_expr(expr_str):
     """
     Evaluate a conversion expression that may contain prefix!() macros,
@@ -206,36 +339,25 @@ def evaluate_conversion_expr(expr_str):
     expr = expr_str.strip()
 
     # Replace all prefix!(name) with their numeric values
-    def replace_prefix(m):
-        name = m.group(1)
-        val = resolve_prefix(name)
-        return repr(val)
-
-    expr = re.sub(r'prefix!\((\w+)\)', replace_prefix, expr)
+    expr = PREFIX_MACRO_RE.sub(replace_prefix, expr)
 
     # Clean Rust number format (underscores, E notation)
     # We need to handle tokens like 1.609_344_E3 -> 1.609344E3
-    # But after prefix replacement, we might have repr() floats too
-    # Process numeric tokens that still have underscores
-    def clean_number_token(m):
-        return m.group(0).replace("_", "")
+    expr = NUMBER_TOKEN_RE.sub(clean_number_token, expr)
 
-    expr = re.sub(r'[\d._]+[eE][+-]?\d+', clean_number_token, expr)
-    expr = re.sub(r'[\d._]+\.[\d_]*', clean_number_token, expr)
-
-    # Now evaluate safely
+    # Now evaluate the plain arithmetic that remains
     try:
-        result = eval(expr)
-        return float(result)
-    except Exception as e:
+        return evaluate_arithmetic(expr)
+    except (ValueError, ZeroDivisionError) as e:
         raise ValueError(f"Cannot evaluate expression '{expr_str}' -> '{expr}': {e}")
 
 
 def extract_prefixes_used(expr_str):
     """Extract the prefix names used in a conversion expression."""
-    return set(re.findall(r'prefix!\((\w+)\)', expr_str))
+    return frozenset(PREFIX_MACRO_RE.findall(expr_str))
 
 
+@functools.lru_cache(maxsize=4096)
 def classify_system(identifier, expr_str, prefixes_used, property_name, in_roman_section):
     """Classify the unit system based on various heuristics."""
 
@@ -247,24 +369,13 @@ def classify_system(identifier, expr_str, prefixes_used, property_name, in_roman
     if prefixes_used & IEC_PREFIXES:
         return "IEC"
 
-    # Check known unit sets (using identifier)
-    if identifier in IMPERIAL_US_UNITS:
-        return "Imperial"
-    if identifier in CGS_UNITS:
-        return "CGS"
-    if identifier in NAUTICAL_UNITS:
-        return "Nautical"
-    if identifier in ASTRONOMICAL_UNITS:
-        return "Astronomical"
-
-    # For information property, check specific units
-    if property_name == "information":
-        if identifier in INFORMATION_UNITS:
-            return "Information"
+    # Check known unit sets (using identifier); information units only count
+    # for the information property
+    system = UNIT_TO_SYSTEM.get(identifier)
+    if system is not None and (system != "Information" or property_name == "information"):
+        return system
 
     # Atomic/Natural units - check identifier patterns
-    if identifier in ATOMIC_NATURAL_UNITS:
-        return "Atomic/Natural"
     if identifier.startswith("atomic_unit_of_"):
         return "Atomic/Natural"
     if identifier.startswith("natural_unit_of_") and property_name != "information":
@@ -274,19 +385,15 @@ def classify_system(identifier, expr_str, prefixes_used, property_name, in_roman
     if identifier.endswith("_sidereal") or identifier.endswith("_tropical"):
         return "Astronomical"
 
-    if identifier in METRIC_NON_SI_UNITS:
-        return "Metric"
-
     # If conversion expression uses only SI prefix!() macros (possibly with /prefix!(kilo) for mass base unit)
     # and no literal numbers other than division factors, it's SI
     if prefixes_used:
         non_si_prefixes = prefixes_used - SI_PREFIXES
         if not non_si_prefixes:
             # Check if the expression also has non-prefix numeric literals
-            expr_no_prefix = re.sub(r'prefix!\(\w+\)', '', expr_str).strip()
+            expr_no_prefix = PREFIX_MACRO_RE.sub('', expr_str)
             # Remove operators and whitespace
-            expr_no_prefix = re.sub(r'[*/+\-\s]', '', expr_no_prefix)
-            if not expr_no_prefix or expr_no_prefix in ('8.0', '2.0', '4.0'):
+            if expr_no_prefix.translate(STRIP_OPERATORS) in SI_EXPR_REMAINDERS:
                 # Pure SI prefix expression (with possible /8.0 for bits)
                 return "SI"
 
@@ -309,26 +416,46 @@ def classify_system(identifier, expr_str, prefixes_used, property_name, in_roman
     return "other"
 
 
+def squash_whitespace(raw):
+    """Decode source bytes, collapsing each run of whitespace to one space."""
+    return b" ".join(raw.split()).decode('utf-8')
+
+
 def parse_rs_file(filepath):
-    """Parse a single .rs file and extract unit definitions."""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
+    """
+    Parse a single .rs file and extract unit definitions.
 
+    Returns (property_name, units, errors); property_name is None when the
+    file declares no quantity.
+
+    The units block is read in one pass over TOKEN_RE matches. An entry's
+    conversion expression runs from its @identifier to the first ';' outside
+    parentheses (a ',' there separates the offset), and the entry ends at the
+    next ';' once its three strings have been seen.
+    """
+    with open(filepath, 'rb') as f:
+        # mmap cannot map an empty file
+        if os.fstat(f.fileno()).st_size == 0:
+            return None, [], []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+            if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                content.madvise(mmap.MADV_SEQUENTIAL)
+            return parse_rs_content(content, os.path.basename(filepath))
+
+
+def parse_rs_content(content, filename):
+    """Parse the bytes of a .rs file; only values that reach the output are decoded."""
     # Extract property name from quantity line
-    # Pattern: quantity: TypeName; "property_name";
-    quantity_match = re.search(r'quantity:\s+\w+;\s*"([^"]+)"', content)
+    quantity_match = QUANTITY_RE.search(content)
     if not quantity_match:
-        return None, []
+        return None, [], []
 
-    property_name = quantity_match.group(1)
+    # Shared by every unit record from this file
+    property_name = sys.intern(quantity_match.group(1).decode('utf-8'))
 
-    # Extract the units { ... } block
-    # Find "units {" and then match to its closing "}"
-    units_match = re.search(r'units\s*\{(.*?)^\s*\}', content, re.DOTALL | re.MULTILINE)
+    units_match = UNITS_BLOCK_START_RE.search(content)
     if not units_match:
-        return property_name, []
-
-    units_block = units_match.group(1)
+        return property_name, [], []
 
     # Parse unit entries from the units block
     units = []
@@ -337,256 +464,207 @@ def parse_rs_file(filepath):
     # Track whether we're in an "Ancient Roman" section
     in_roman_section = False
 
-    # Split into lines for processing
-    lines = units_block.split('\n')
-
-    # We'll accumulate text and process entries
-    # An entry starts with @identifier and ends with the last semicolon (after the strings)
-    current_entry = ""
-    i = 0
-
-    while i < len(lines):
-        line = lines[i]
-        stripped = line.strip()
-
-        # Check for Roman section comment
-        if re.match(r'^//+\s*[Aa]ncient\s+[Rr]oman', stripped):
-            in_roman_section = True
-            i += 1
-            continue
-
-        # Skip comment-only lines (but not mixed lines that have code + comment)
-        if stripped.startswith('//'):
-            i += 1
-            continue
-
-        # Skip empty lines
-        if not stripped:
-            i += 1
-            continue
-
-        # Remove inline comments (be careful not to remove strings)
-        # Simple approach: remove // that's not inside a string
-        code_line = remove_inline_comment(stripped)
-
-        if '@' in code_line and not current_entry:
+    brace_depth = 1
+    # State of the entry being read; identifier is None between entries
+    identifier = None
+    entry_start = 0
+    exprs = []          # conversion expression, then offset expression if present
+    expr_pieces = []    # text of the current expression with comments cut out
+    expr_start = 0      # start of expression text not yet in expr_pieces
+    paren_depth = 0
+    in_strings = False  # past the ';' that ends the expression part
+    strings = []
+
+    for m in TOKEN_RE.finditer(content, units_match.end()):
+        kind = m.lastindex
+
+        if kind == TOKEN_COMMENT:
+            if identifier is not None and not in_strings:
+                expr_pieces.append(content[expr_start:m.start()])
+                expr_start = m.end()
+            # Check for Roman section comment (only on comment-only lines)
+            line_start = content.rfind(b'\n', 0, m.start()) + 1
+            if (not content[line_start:m.start()].strip()
+                    and ROMAN_COMMENT_RE.match(m.group(TOKEN_COMMENT))):
+                in_roman_section = True
+
+        elif kind == TOKEN_STRING:
+            if in_strings:
+                strings.append(m.group(TOKEN_STRING)[1:-1].decode('utf-8'))
+
+        elif kind == TOKEN_IDENTIFIER:
+            if identifier is not None:
+                # The previous entry never completed
+                entry = squash_whitespace(content[entry_start:m.start()])
+                errors.append(f"  Failed to parse entry in {filename}: {entry[:100]}")
             # Start of a new entry
-            current_entry = code_line
-        elif current_entry:
-            # Continuation of previous entry
-            current_entry += " " + code_line
-        elif code_line:
-            # Possibly a continuation from a previous line (strings on next line)
-            # This shouldn't normally happen with our logic, but handle gracefully
-            current_entry = code_line
-
-        # Check if entry is complete (has the pattern: "...", "...", "...";)
-        # We need at least 3 quoted strings followed by a semicolon
-        if current_entry and is_entry_complete(current_entry):
-            result = parse_unit_entry(current_entry, property_name, in_roman_section)
-            if result:
-                units.append(result)
-            elif current_entry.strip():
-                errors.append(f"  Failed to parse entry in {filepath.name}: {current_entry[:100]}")
-            current_entry = ""
-
-        i += 1
+            identifier = m.group(TOKEN_IDENTIFIER).decode('utf-8')
+            entry_start = m.start()
+            exprs = []
+            expr_pieces = []
+            expr_start = m.end()
+            paren_depth = 0
+            in_strings = False
+            strings = []
 
+        else:
+            punct = m.group(TOKEN_PUNCT)
+            if punct == b'{':
+                brace_depth += 1
+            elif punct == b'}':
+                brace_depth -= 1
+                if brace_depth == 0:
+                    break
+            elif identifier is None:
+                continue
+            elif in_strings:
+                # The entry is complete once its three strings are followed by ';'
+                if punct == b';' and len(strings) >= 3:
+                    result = parse_unit_entry(identifier, exprs, strings, property_name, in_roman_section)
+                    if result:
+                        units.append(result)
+                    else:
+                        entry = squash_whitespace(content[entry_start:m.end()])
+                        errors.append(f"  Failed to parse entry in {filename}: {entry[:100]}")
+                    identifier = None
+            elif punct == b'(':
+                paren_depth += 1
+            elif punct == b')':
+                paren_depth -= 1
+            elif paren_depth == 0:
+                # A top-level ',' separates conversion and offset; ';' ends the expression
+                expr_pieces.append(content[expr_start:m.start()])
+                exprs.append(squash_whitespace(b"".join(expr_pieces)))
+                expr_pieces = []
+                expr_start = m.end()
+                if punct == b';':
+                    in_strings = True
+
+    # Sorted here so main() can write each property without a global sort
+    units.sort(key=itemgetter("unit"))
     return property_name, units, errors
 
 
-def remove_inline_comment(line):
-    """Remove inline comments, being careful about strings."""
-    # Find // that's not inside a quoted string
-    in_string = False
-    i = 0
-    while i < len(line):
-        if line[i] == '"':
-            in_string = not in_string
-        elif not in_string and i + 1 < len(line) and line[i:i+2] == '//':
-            return line[:i].strip()
-        i += 1
-    return line
-
-
-def is_entry_complete(entry):
-    """Check if an entry has all required parts (3 quoted strings ending with semicolon)."""
-    # Count the number of quoted strings
-    strings = re.findall(r'"[^"]*"', entry)
-    # An entry is complete when it has at least 3 quoted strings and ends with ;
-    return len(strings) >= 3 and entry.rstrip().endswith(';')
-
-
-def parse_unit_entry(entry, property_name, in_roman_section):
+def parse_unit_entry(identifier, exprs, strings, property_name, in_roman_section):
     """
-    Parse a single unit entry like:
+    Build a unit record from the parts of an entry like:
     @identifier: conversion_expr; "symbol", "singular", "plural";
     or
     @identifier: conversion_expr, offset_expr; "symbol", "singular", "plural";
-    """
-    # Pattern: @identifier: <expr_part>; "symbol", "singular", "plural";
-    # The expr_part may contain a comma for offset (temperature)
-
-    # Extract identifier
-    id_match = re.match(r'@(\w+)\s*:', entry)
-    if not id_match:
-        return None
-
-    identifier = id_match.group(1)
-    rest = entry[id_match.end():].strip()
 
-    # Split on the FIRST semicolon to get the expression part and the strings part
-    first_semi = find_first_semicolon_outside_strings(rest)
-    if first_semi < 0:
+    exprs holds the conversion expression (still led by the ':' that follows
+    the identifier) and, for temperature-style units, the offset expression.
+    The tokenizer has already split off the offset, so the number of exprs
+    selects the record builder.
+    """
+    if not identifier or not exprs[0].startswith(':'):
         return None
 
-    expr_part = rest[:first_semi].strip()
-    strings_part = rest[first_semi + 1:].strip()
+    conversion_expr = exprs[0][1:].strip()
+    symbol, singular, plural = strings[:3]
 
-    # Extract the three quoted strings from strings_part
-    string_matches = re.findall(r'"([^"]*)"', strings_part)
-    if len(string_matches) < 3:
+    try:
+        if len(exprs) == 1:
+            return parse_simple_entry(identifier, conversion_expr, symbol, singular, plural,
+                                      property_name, in_roman_section)
+        if len(exprs) == 2:
+            return parse_offset_entry(identifier, conversion_expr, exprs[1], symbol, singular, plural,
+                                      property_name, in_roman_section)
+    except ValueError as e:
+        print(f"  Warning: {e}", file=sys.stderr)
         return None
 
-    symbol = string_matches[0]
-    singular = string_matches[1]
-    plural = string_matches[2]
-
-    # Parse the expression part for conversion factor and optional offset
-    # Check if there's a comma separating conversion and offset
-    # But be careful: prefix!(yotta) / prefix!(kilo) contains no comma
-    # Temperature offset: 1.0_E0, 273.15_E0
-    # We need to distinguish between commas in the expression vs offset separator
-    # The offset comma is the one that separates two complete expressions
-
-    conversion_factor = None
-    conversion_offset = None
-
-    # Try to split on comma for offset (only if not inside prefix!())
-    parts = split_on_offset_comma(expr_part)
-
-    if len(parts) == 2:
-        # Has offset
-        try:
-            conversion_factor = evaluate_conversion_expr(parts[0])
-            conversion_offset = evaluate_conversion_expr(parts[1])
-        except ValueError as e:
-            print(f"  Warning: {e}", file=sys.stderr)
-            return None
-    elif len(parts) == 1:
-        try:
-            conversion_factor = evaluate_conversion_expr(parts[0])
-        except ValueError as e:
-            print(f"  Warning: {e}", file=sys.stderr)
-            return None
-    else:
-        print(f"  Warning: unexpected number of parts in expression: {expr_part}", file=sys.stderr)
-        return None
+    print(f"  Warning: unexpected number of parts in expression: {', '.join([conversion_expr] + exprs[1:])}",
+          file=sys.stderr)
+    return None
 
-    # Determine system classification
-    prefixes_used = extract_prefixes_used(expr_part)
-    system = classify_system(identifier, expr_part, prefixes_used, property_name, in_roman_section)
 
-    result = {
+def parse_simple_entry(identifier, conversion_expr, symbol, singular, plural, property_name, in_roman_section):
+    """Build the record for a unit with only a conversion factor (nearly all units)."""
+    prefixes_used = extract_prefixes_used(conversion_expr)
+    return {
         "unit": singular,
         "symbol": symbol,
         "plural": plural,
         "property": property_name,
-        "conversion_factor": conversion_factor,
-        "system": system,
+        "conversion_factor": evaluate_conversion_expr(conversion_expr),
+        "system": classify_system(identifier, conversion_expr, prefixes_used, property_name, in_roman_section),
     }
 
-    if conversion_offset is not None:
-        result["conversion_offset"] = conversion_offset
-
-    return result
-
-
-def find_first_semicolon_outside_strings(s):
-    """Find the index of the first semicolon that's not inside a quoted string."""
-    in_string = False
-    paren_depth = 0
-    for i, c in enumerate(s):
-        if c == '"':
-            in_string = not in_string
-        elif not in_string:
-            if c == '(':
-                paren_depth += 1
-            elif c == ')':
-                paren_depth -= 1
-            elif c == ';' and paren_depth == 0:
-                return i
-    return -1
-
 
-def split_on_offset_comma(expr_part):
-    """
-    Split an expression on the comma that separates conversion factor from offset.
-    Be careful not to split on commas inside parentheses (e.g., prefix!(name)).
-
-    The offset comma pattern is: after the conversion expression is complete,
-    there's a comma followed by the offset value.
+def parse_offset_entry(identifier, conversion_expr, offset_expr, symbol, singular, plural,
+                       property_name, in_roman_section):
+    """Build the record for a unit with a conversion factor and an offset (temperatures)."""
+    conversion_factor = evaluate_conversion_expr(conversion_expr)
+    conversion_offset = evaluate_conversion_expr(offset_expr)
 
-    This is tricky because expressions like `prefix!(yotta) / prefix!(kilo)` don't have
-    an offset comma, but `1.0_E0, 273.15_E0` does.
-    """
-    paren_depth = 0
-    for i, c in enumerate(expr_part):
-        if c == '(':
-            paren_depth += 1
-        elif c == ')':
-            paren_depth -= 1
-        elif c == ',' and paren_depth == 0:
-            # This is a top-level comma -- likely the offset separator
-            return [expr_part[:i].strip(), expr_part[i+1:].strip()]
-    return [expr_part]
+    expr_part = f"{conversion_expr}, {offset_expr}"
+    prefixes_used = extract_prefixes_used(expr_part)
+    return {
+        "unit": singular,
+        "symbol": symbol,
+        "plural": plural,
+        "property": property_name,
+        "conversion_factor": conversion_factor,
+        "system": classify_system(identifier, expr_part, prefixes_used, property_name, in_roman_section),
+        "conversion_offset": conversion_offset,
+    }
 
 
 def main():
-    all_units = []
     all_errors = []
-    property_counts = {}
+    property_counts = Counter()
+    system_counts = Counter()
+    units_by_property = {}
 
     # Get all .rs files except excluded ones
-    rs_files = sorted([
-        f for f in SI_DIR.glob("*.rs")
-        if f.name not in EXCLUDED_FILES
-    ])
+    with os.scandir(SI_DIR) as it:
+        rs_files = sorted([
+            entry.path for entry in it
+            if entry.name.endswith(".rs") and entry.name not in EXCLUDED_FILES and entry.is_file()
+        ])
 
     print(f"Found {len(rs_files)} .rs files to parse (excluding {EXCLUDED_FILES})")
     print()
 
-    for filepath in rs_files:
-        result = parse_rs_file(filepath)
-        if result is None:
-            continue
-
-        if len(result) == 3:
-            property_name, units, errors = result
-        else:
-            property_name, units = result
-            errors = []
-
-        if errors:
-            all_errors.extend(errors)
-
-        if units:
-            property_counts[property_name] = len(units)
-            all_units.extend(units)
-
-    # Sort by property, then by unit name
-    all_units.sort(key=lambda u: (u["property"], u["unit"]))
+    # Files are independent and parsing is CPU-bound, so parse them in worker processes
+    with ProcessPoolExecutor() as executor:
+        for property_name, units, errors in executor.map(parse_rs_file, rs_files, chunksize=4):
+            if errors:
+                all_errors.extend(errors)
+
+            if units:
+                # Strings unpickled from the workers are fresh copies; re-intern the
+                # repeated fields so all records share one instance of each value
+                property_name = sys.intern(property_name)
+                for unit in units:
+                    unit["property"] = property_name
+                    unit["system"] = sys.intern(unit["system"])
+                property_counts[property_name] += len(units)
+                system_counts.update(unit["system"] for unit in units)
+
+                # Units arrive sorted by name; only a property spread over
+                # several files needs its combined list re-sorted
+                if property_name in units_by_property:
+                    units_by_property[property_name].extend(units)
+                    units_by_property[property_name].sort(key=itemgetter("unit"))
+                else:
+                    units_by_property[property_name] = units
+
+    total_units = sum(property_counts.values())
 
     # Ensure output directory exists
-    OUTPUT_FILE.parent.mkdir(parents=True, exist_ok=True)
+    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
 
-    # Write JSONL
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        for unit in all_units:
-            f.write(json.dumps(unit, ensure_ascii=False) + '\n')
+    # Write JSONL sorted by property, then by unit name, one property at a time
+    # (symbols such as "°C" and "a₀" are written as UTF-8, not escaped)
+    with open(OUTPUT_FILE, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        for prop in sorted(units_by_property):
+            f.write(''.join([json.dumps(unit, ensure_ascii=False) + '\n'
+                             for unit in units_by_property[prop]]))
 
     print(f"Output written to: {OUTPUT_FILE}")
-    print(f"Total units: {len(all_units)}")
+    print(f"Total units: {total_units}")
     print()
 
     # Print counts per property (sorted)
@@ -597,7 +675,7 @@ def main():
 
     print()
     print(f"Total properties: {len(property_counts)}")
-    print(f"Total units: {len(all_units)}")
+    print(f"Total units: {total_units}")
 
     if all_errors:
         print()
@@ -606,10 +684,6 @@ def main():
             print(err)
 
     # System distribution
-    system_counts = {}
-    for u in all_units:
-        s = u["system"]
-        system_counts[s] = system_counts.get(s, 0) + 1
     print()
     print("System distribution:")
     print("-" * 50)